@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, lazy, Suspense } from 'react';
 
 // UserContext provides the authenticated user's session data (role, email, etc.)
 // and a logout function to any component in the tree without prop drilling.
@@ -7,6 +7,12 @@ import { UserContext } from './UserContext';
 // Supabase client — used here to manage session lifecycle (restore, listen, sign out)
 import { supabase } from './supabaseClient';
 
+// Cached Supabase reads — cleared on logout so the next user starts fresh
+import { invalidateQueries } from './queryCache';
+
+// Cached profiles lookup — shared with LoginPage so a session reads the row once
+import { fetchProfile } from './profile';
+
 // Public-facing pages — no login required
 import SplashScreen from './SplashScreen';             // Animated intro screen on first load
 import LandingPage from './LandingPage';               // Marketing home page
@@ -18,22 +24,27 @@ import ResetPasswordPage from './ResetPasswordPage';   // Step 2 of password res
 // Shared authenticated layout — wraps all logged-in pages with the sidebar
 import AppLayout from './AppLayout';
 
+// Shows a reload prompt if a page (or its lazily loaded chunk) fails to load
+import PageErrorBoundary from './PageErrorBoundary';
+
+import './App.css';
+
+// Lecturer and student page components are code-split: each is downloaded on
+// first visit, so the landing page and auth forms don't pay for the whole app.
 // Lecturer page components
-import DashboardPage from './lecturer/DashboardPage'; // Lecturer overview / home
-import Assessments from './lecturer/Assessments';     // Assessment management
-import GradingQueue from './lecturer/GradingQueue';   // Submissions awaiting grading review
-import GradingDetail from './lecturer/GradingDetail'; // Individual submission evaluation view
-import Analytics from './lecturer/Analytics';         // Class performance analytics
+const DashboardPage = lazy(() => import('./lecturer/DashboardPage')); // Lecturer overview / home
+const Assessments   = lazy(() => import('./lecturer/Assessments'));   // Assessment management
+const GradingQueue  = lazy(() => import('./lecturer/GradingQueue'));  // Submissions awaiting grading review
+const GradingDetail = lazy(() => import('./lecturer/GradingDetail')); // Individual submission evaluation view
+const Analytics     = lazy(() => import('./lecturer/Analytics'));     // Class performance analytics
 
 // Student page components
-import StudentDashboard    from './student/Dashboard';           // Student overview / home
-import StudentAssessments  from './student/StudentAssessments';  // Available + completed assessments
-import StudentAnalytics    from './student/Analytics';           // Student analytics (placeholder)
-import TakeTest      from './student/TakeTest';       // Test-taking interface for students
-import Results       from './student/Results';        // Student's past test results
-import ResultDetail  from './student/ResultDetail';   // Per-submission score breakdown
-
-import './App.css';
+const StudentDashboard   = lazy(() => import('./student/Dashboard'));          // Student overview / home
+const StudentAssessments = lazy(() => import('./student/StudentAssessments')); // Available + completed assessments
+const StudentAnalytics   = lazy(() => import('./student/Analytics'));          // Student analytics (placeholder)
+const TakeTest     = lazy(() => import('./student/TakeTest'));     // Test-taking interface for students
+const Results      = lazy(() => import('./student/Results'));      // Student's past test results
+const ResultDetail = lazy(() => import('./student/ResultDetail')); // Per-submission score breakdown
 
 // All route keys that require authentication.
 // Any key in this list causes AppLayout (sidebar) to be rendered.
@@ -67,16 +78,12 @@ function App() {
   // Holds the submission object selected from Results so ResultDetail can render it.
   const [selectedResult, setSelectedResult] = useState(null);
 
-  // On mount: check for an active Supabase session (handles page refresh)
-  // and subscribe to auth state changes for the lifetime of the app.
+  // On mount: subscribe to auth state changes for the lifetime of the app.
   useEffect(() => {
-    // Restore session if the user is already signed in from a previous visit
-    supabase.auth.getSession().then(({ data: { session } }) => {
-      if (session) hydrateUserFromSession(session);
-    });
-
     // onAuthStateChange fires on: sign in, sign out, token refresh, and initial load.
-    // This is the single source of truth for session state.
+    // This is the single source of truth for session state — the INITIAL_SESSION
+    // event restores a session from a previous visit (page refresh), so a separate
+    // getSession() call would only fetch the same profile row a second time.
     const { data: { subscription } } = supabase.auth.onAuthStateChange(
       (event, session) => {
         if (event === 'PASSWORD_RECOVERY') {
@@ -102,11 +109,7 @@ function App() {
   // Fetches the profiles row for the given Supabase session and sets user state.
   // Also navigates to the correct role home if the user is currently on a public page.
   const hydrateUserFromSession = async (session) => {
-    const { data: profile } = await supabase
-      .from('profiles')
-      .select('role, full_name')
-      .eq('id', session.user.id)
-      .single();
+    const profile = await fetchProfile(session.user.id);
 
     // Primary source: profiles table row.
     // Fallback: user_metadata written at sign-up time — covers cases where the
@@ -133,6 +136,13 @@ function App() {
     }
   };
 
+  // Maps each detail route to the setter for the record it renders
+  const selectionSetters = {
+    'grading-detail': setSelectedSubmission, // GradingQueue → GradingDetail
+    'result-detail':  setSelectedResult,     // Results → ResultDetail
+    'take-test':      setSelectedAssessment, // StudentAssessments → TakeTest
+  };
+
   // Called by SplashScreen once its animation completes — reveals the app
   const handleSplashFinish = () => setShowSplash(false);
 
@@ -141,25 +151,13 @@ function App() {
   // `data` — optional user payload for optimistic state update right after sign-in,
   //           before the Supabase onAuthStateChange listener has a chance to fire.
   const handleNavigate = (page, data) => {
-    // When navigating to a grading detail view, store the submission object separately.
+    // Detail views receive the selected record (submission, result or assessment)
+    // as `data` — look up the state setter that holds it for the target page.
     // For all other pages, `data` is an optional user payload for post-login hydration.
-    if (page === 'grading-detail') {
-      setSelectedSubmission(data ?? null);
-      setCurrentPage('grading-detail');
-      return;
-    }
-
-    // When navigating to a result detail view, store the submission object.
-    if (page === 'result-detail') {
-      setSelectedResult(data ?? null);
-      setCurrentPage('result-detail');
-      return;
-    }
-
-    // When navigating to the test-taking view, store the selected assessment object.
-    if (page === 'take-test') {
-      setSelectedAssessment(data ?? null);
-      setCurrentPage('take-test');
+    const setSelection = selectionSetters[page];
+    if (setSelection) {
+      setSelection(data ?? null);
+      setCurrentPage(page);
       return;
     }
 
@@ -177,10 +175,16 @@ function App() {
 
   // Signs the user out via Supabase (clears the session from storage automatically),
   // then returns to the landing page. onAuthStateChange will set user to null.
-  const logout = async () => {
+  // Wrapped in useCallback so its identity (and the context value) stays stable.
+  const logout = useCallback(async () => {
     await supabase.auth.signOut();
+    invalidateQueries('');
     setCurrentPage('landing');
-  };
+  }, []);
+
+  // Context value is memoized so consumers (Sidebar, every page) only
+  // re-render when the user actually changes, not on every App render
+  const userContextValue = useMemo(() => ({ user, logout }), [user, logout]);
 
   // True when the current route requires authentication (renders inside AppLayout)
   const isAuthenticated = AUTHENTICATED_PAGES.includes(currentPage);
@@ -211,7 +215,7 @@ function App() {
   return (
     // UserContext.Provider makes { user, logout } available to any component
     // in the tree (e.g. Sidebar reads role to show the correct nav items)
-    <UserContext.Provider value={{ user, logout }}>
+    <UserContext.Provider value={userContextValue}>
       <>
         {/* Splash screen overlay — sits on top until its animation finishes */}
         {showSplash && <SplashScreen onFinish={handleSplashFinish} />}
@@ -230,7 +234,14 @@ function App() {
                 AppLayout passes currentPage and onNavigate down to the Sidebar. */}
             {isAuthenticated && (
               <AppLayout currentPage={currentPage} onNavigate={handleNavigate}>
-                {renderPage()}
+                {/* Suspense covers the brief download of a lazily loaded page chunk;
+                    the boundary catches a chunk that fails to download. Keyed on
+                    the page so navigating away clears a previous failure. */}
+                <PageErrorBoundary key={currentPage}>
+                  <Suspense fallback={null}>
+                    {renderPage()}
+                  </Suspense>
+                </PageErrorBoundary>
               </AppLayout>
             )}
           </>
@@ -1,5 +1,6 @@
 import { useState } from 'react';
 import { supabase } from './supabaseClient';
+import { fetchProfile } from './profile';
 import './LoginPage.css';
 
 function LoginPage({ onNavigate }) {
@@ -30,11 +31,8 @@ function LoginPage({ onNavigate }) {
     // Primary source: profiles table (populated by the handle_new_user trigger on sign up).
     // Fallback: user_metadata set in supabase.auth.signUp() options.data —
     // used when the trigger hasn't run yet or there is no profile row for this user.
-    const { data: profile } = await supabase
-      .from('profiles')
-      .select('role, full_name')
-      .eq('id', data.user.id)
-      .single();
+    // The result is cached, so App's SIGNED_IN handler reuses it instead of re-querying.
+    const profile = await fetchProfile(data.user.id);
 
     const role     = profile?.role     ?? data.user.user_metadata?.role;
     const fullName = profile?.full_name ?? data.user.user_metadata?.full_name ?? '';
@@ -0,0 +1,40 @@
+import React from 'react';
+
+// Catches errors thrown while rendering an authenticated page — most often a
+// lazily loaded page chunk failing to download (a network blip, or a tab left
+// open across a deploy that removed the old hashed chunks). Without it the
+// rejection would unmount the whole tree and leave a blank screen.
+//
+// React.lazy remembers a failed import, so retrying in place can't recover;
+// a full reload fetches a fresh index.html and the current chunk names.
+// App.js keys the boundary on the current page, so navigating elsewhere
+// clears the error.
+class PageErrorBoundary extends React.Component {
+  state = { failed: false };
+
+  static getDerivedStateFromError() {
+    return { failed: true };
+  }
+
+  componentDidCatch(error) {
+    console.error(error);
+  }
+
+  render() {
+    if (!this.state.failed) return this.props.children;
+
+    return (
+      <div className="page-error">
+        <div className="page-error-title">This page failed to load</div>
+        <div className="page-error-sub">
+          Check your connection, or reload to pick up the latest version of EvalAI.
+        </div>
+        <button className="page-error-btn" onClick={() => window.location.reload()}>
+          Reload
+        </button>
+      </div>
+    );
+  }
+}
+
+export default PageErrorBoundary;
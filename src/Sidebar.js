@@ -18,18 +18,23 @@ const STUDENT_NAV = [
   { key: 'student-analytics',   label: 'Analytics'    },
 ];
 
+// Per-role sidebar config, looked up once per render instead of branching on
+// the role string in several places. Unrecognised roles fall back to lecturer.
+const ROLE_CONFIG = {
+  lecturer: { nav: LECTURER_NAV, label: 'Lecturer' },
+  student:  { nav: STUDENT_NAV,  label: 'Student'  },
+};
+
 function Sidebar({ currentPage, onNavigate }) {
   // Consume the UserContext to read the active user's role and the logout function.
   // This avoids needing to prop-drill role all the way from App → AppLayout → Sidebar.
   const { user, logout } = useUser();
 
-  // Select the correct nav item set based on the user's role.
-  // Defaults to the lecturer nav for any unrecognised role value.
-  const navItems = user?.role === 'student' ? STUDENT_NAV : LECTURER_NAV;
+  // Select the correct nav item set and role label for the user's role
+  const { nav: navItems, label: displayRole } = ROLE_CONFIG[user?.role] ?? ROLE_CONFIG.lecturer;
 
   // Derive display initials from the user's email (e.g. "te" → "TE")
   const initials = user?.email ? user.email.slice(0, 2).toUpperCase() : '??';
-  const displayRole = user?.role === 'student' ? 'Student' : 'Lecturer';
 
   return (
     <aside className="sidebar">
@@ -0,0 +1,17 @@
+// Date formatting shared by the lecturer and student views. The formatters
+// are built once — toLocaleDateString() with options constructs a new
+// Intl.DateTimeFormat on every call, which adds up across long lists.
+const DATE_FORMAT  = new Intl.DateTimeFormat('en-GB', { day: 'numeric', month: 'short', year: 'numeric' });
+const SHORT_FORMAT = new Intl.DateTimeFormat('en-GB', { day: 'numeric', month: 'short' });
+
+// e.g. "3 Mar 2026". A missing timestamp renders as a dash.
+export function formatDate(iso) {
+  if (!iso) return '—';
+  return DATE_FORMAT.format(new Date(iso));
+}
+
+// e.g. "3 Mar" — for compact labels such as chart axes.
+export function formatShortDate(iso) {
+  if (!iso) return '—';
+  return SHORT_FORMAT.format(new Date(iso));
+}
@@ -0,0 +1,15 @@
+// Grade bands shared by the lecturer and student views, highest first.
+// Thresholds are percentages; anything below the last band gets the
+// caller's lowest label.
+const GRADE_BANDS = [
+  { min: 90, label: 'Excellent'    },
+  { min: 75, label: 'Good'         },
+  { min: 60, label: 'Satisfactory' },
+];
+
+// Maps a percentage to its band label. null means the answer or submission
+// hasn't been graded yet.
+export function gradeLabel(pct, lowest = 'Needs Improvement') {
+  if (pct === null) return 'Not Graded';
+  return GRADE_BANDS.find(b => pct >= b.min)?.label ?? lowest;
+}
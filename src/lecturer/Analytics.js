@@ -1,6 +1,7 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery, peekQuery, refreshQuery } from '../queryCache';
 import './Analytics.css';
 
 // ── Constants ───────────────────────────────────────────────────────────────
@@ -12,6 +13,42 @@ const BANDS = [
   { label: '< 60%',   color: '#ef4444', test: p => p <  60 },
 ];
 
+// Submissions only change when students submit or a lecturer grades,
+// so a short TTL keeps repeated visits off the network.
+const ANALYTICS_TTL_MS = 60 * 1000;
+
+// ── Data loading ───────────────────────────────────────────────────────────
+// Fetches submissions with their answers embedded (one round trip) and splits
+// them into one { subs, answers } block per assessment. Blocks are cached per
+// assessment, so "All Assessments" only fetches the ones not already loaded
+// and a grading write only invalidates its own assessment.
+async function fetchBlocks(ids) {
+  const blocks = Object.fromEntries(ids.map(id => [id, { subs: [], answers: [] }]));
+
+  const { data: subs, error } = await supabase
+    .from('submissions')
+    .select(`
+      id,
+      status,
+      assessment_id,
+      answers ( submission_id, ai_score, marks_awarded, questions ( id, text, marks, order_index ) )
+    `)
+    .in('assessment_id', ids);
+  if (error) throw error;
+
+  for (const { answers, ...s } of subs) {
+    blocks[s.assessment_id].subs.push(s);
+    blocks[s.assessment_id].answers.push(...(answers ?? []));
+  }
+  return blocks;
+}
+
+function combineBlocks(blocks) {
+  const subs    = blocks.flatMap(b => b.subs);
+  const answers = blocks.flatMap(b => b.answers);
+  return subs.length ? { subs, answers } : { empty: true };
+}
+
 // ── Component ──────────────────────────────────────────────────────────────
 function Analytics() {
   const { user } = useUser();
@@ -21,18 +58,28 @@ function Analytics() {
   const [loading,     setLoading]     = useState(true);
   const [rawData,     setRawData]     = useState(null);
 
+  // Bumped on every load so a background refresh for an old selection
+  // doesn't overwrite the current one
+  const loadSeq = useRef(0);
+
   // ── Load assessment list ──────────────────────────────────────────────────
   useEffect(() => {
-    supabase
-      .from('assessments')
-      .select('id, title')
-      .eq('created_by', user.id)
-      .order('created_at', { ascending: false })
-      .then(({ data }) => setAssessments(data ?? []));
+    cachedQuery(`assessments:options:${user.id}`, ANALYTICS_TTL_MS, async () => {
+      const { data, error } = await supabase
+        .from('assessments')
+        .select('id, title')
+        .eq('created_by', user.id)
+        .order('created_at', { ascending: false });
+      if (error) throw error;
+      return data;
+    })
+      .then(setAssessments)
+      .catch(() => setAssessments([]));
   }, [user.id]);
 
   // ── Load submissions + answers for selection ──────────────────────────────
   const load = useCallback(async () => {
+    const seq = ++loadSeq.current;
     setLoading(true);
 
     const ids = selectedId === 'all'
@@ -45,31 +92,49 @@ function Analytics() {
       return;
     }
 
-    const { data: subs } = await supabase
-      .from('submissions')
-      .select('id, status')
-      .in('assessment_id', ids);
-
-    if (!subs?.length) {
-      setRawData({ empty: true });
-      setLoading(false);
-      return;
+    const key = id => `analytics:${id}`;
+
+    let data;
+    try {
+      // Expired blocks are still shown straight away and refreshed in the
+      // background; only assessments with no cached block block the render.
+      const stale   = ids.filter(id => peekQuery(key(id), Infinity) && !peekQuery(key(id), ANALYTICS_TTL_MS));
+      const missing = ids.filter(id => !peekQuery(key(id), Infinity));
+      const pending = missing.length ? fetchBlocks(missing) : null;
+
+      const blocks = await Promise.all(ids.map(id =>
+        peekQuery(key(id), Infinity) ?? cachedQuery(key(id), ANALYTICS_TTL_MS, () => pending.then(b => b[id]))
+      ));
+      data = combineBlocks(blocks);
+
+      if (stale.length) {
+        const refreshed = fetchBlocks(stale);
+        Promise.all(stale.map(id => refreshQuery(key(id), () => refreshed.then(b => b[id]))))
+          .then(() => Promise.all(ids.map(id => peekQuery(key(id), Infinity))))
+          .then(fresh => {
+            if (loadSeq.current === seq && fresh.every(Boolean)) setRawData(combineBlocks(fresh));
+          })
+          .catch(console.error);
+      }
+    } catch (err) {
+      console.error(err);
+      data = { empty: true };
     }
 
-    const { data: answers } = await supabase
-      .from('answers')
-      .select('submission_id, ai_score, marks_awarded, questions(id, text, marks, order_index)')
-      .in('submission_id', subs.map(s => s.id));
-
-    setRawData({ subs, answers: answers ?? [] });
+    // A newer selection may have finished first (cached blocks resolve
+    // instantly) — never let this slower load overwrite its view
+    if (loadSeq.current !== seq) return;
+    setRawData(data);
     setLoading(false);
   }, [selectedId, assessments]);
 
   useEffect(() => { load(); }, [load]);
 
   // ── Derive stats from raw data ────────────────────────────────────────────
-  let stats = null;
-  if (rawData && !rawData.empty) {
+  // Memoized on rawData so re-renders that don't change the data (loading
+  // flags, dropdown changes before the new data lands) skip these passes
+  const stats = useMemo(() => {
+    if (!rawData || rawData.empty) return null;
     const { subs, answers } = rawData;
 
     const graded  = subs.filter(s => s.status === 'Graded');
@@ -90,15 +155,23 @@ function Analytics() {
       })
       .filter(n => n !== null);
 
-    const avg  = scores.length ? Math.round(scores.reduce((a, b) => a + b, 0) / scores.length) : null;
-    const high = scores.length ? Math.max(...scores) : null;
-    const low  = scores.length ? Math.min(...scores) : null;
-
-    // Score bands
-    const bandCounts = BANDS.map(b => ({
-      ...b,
-      count: scores.filter(s => b.test(s)).length,
-    }));
+    // Sum, high and low in one pass — no spread, so large classes can't hit
+    // the engine's argument-count limit
+    let sum = 0, high = null, low = null;
+    for (const s of scores) {
+      sum += s;
+      if (high === null || s > high) high = s;
+      if (low  === null || s < low)  low  = s;
+    }
+    const avg  = scores.length ? Math.round(sum / scores.length) : null;
+
+    // Score bands — one pass; BANDS is highest-first, so each score lands in
+    // the first band whose test it passes
+    const bandCounts = BANDS.map(b => ({ ...b, count: 0 }));
+    for (const s of scores) {
+      const band = bandCounts.find(b => b.test(s));
+      if (band) band.count++;
+    }
     const maxBand = Math.max(...bandCounts.map(b => b.count), 1);
 
     // Per-question averages
@@ -128,7 +201,7 @@ function Analytics() {
         pct:        q.n   > 0 && q.marks > 0 ? Math.round((q.aw / q.n / q.marks) * 100) : null,
       }));
 
-    stats = {
+    return {
       total:      subs.length,
       graded:     graded.length,
       pending,
@@ -138,7 +211,7 @@ function Analytics() {
       questions,
       hasAi: questions.some(q => q.avgAi !== null),
     };
-  }
+  }, [rawData]);
 
   const selectedTitle = selectedId === 'all'
     ? 'All Assessments'
@@ -1,10 +1,14 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery, invalidateQueries } from '../queryCache';
 import './Assessments.css';
 
 const FILTERS = ['All', 'Draft', 'Active', 'Closed'];
 
+// Assessment lists only change through this page, which invalidates them on every write
+const LIST_TTL_MS = 5 * 60 * 1000;
+
 const BLANK_QUESTION = {
   text:         '',
   marks:        '',
@@ -30,6 +34,19 @@ function generateAccessCode() {
   return `${part(4)}-${part(4)}`;
 }
 
+// Runs an assessments write and, if the active access code clashes with
+// another assessment's (unique violation 23505), retries once with a new
+// code. Cheaper than checking for a clash up front and free of races.
+// Covers writes that make a row Active with its existing code too — e.g.
+// reopening an assessment whose old code another open assessment now uses.
+async function writeWithAccessCode(data, write) {
+  const result = await write(data);
+  if (result.error?.code === '23505' && (data.access_code || data.status === 'Active')) {
+    return write({ ...data, access_code: generateAccessCode() });
+  }
+  return result;
+}
+
 // ── Component ──────────────────────────────────────────────────────────────
 function Assessments({ onNavigate }) {
   const { user } = useUser();
@@ -52,36 +69,38 @@ function Assessments({ onNavigate }) {
     setLoading(true);
     setFetchError('');
 
-    const { data, error } = await supabase
-      .from('assessments')
-      .select(`
-        id,
-        title,
-        topic,
-        status,
-        access_code,
-        created_at,
-        questions ( id, marks )
-      `)
-      .eq('created_by', user.id)
-      .order('created_at', { ascending: false });
-
-    if (error) {
+    try {
+      const rows = await cachedQuery(`assessments:list:${user.id}`, LIST_TTL_MS, async () => {
+        const { data, error } = await supabase
+          .from('assessments')
+          .select(`
+            id,
+            title,
+            topic,
+            status,
+            access_code,
+            questions ( marks )
+          `)
+          .eq('created_by', user.id)
+          .order('created_at', { ascending: false });
+        if (error) throw error;
+
+        return data.map(a => ({
+          id:          a.id,
+          title:       a.title,
+          topic:       a.topic,
+          status:      a.status,
+          accessCode:  a.access_code,
+          questions:   a.questions.length,
+          maxMarks:    a.questions.reduce((sum, q) => sum + (q.marks || 0), 0),
+          submissions: 0,
+        }));
+      });
+      setAssessments(rows);
+    } catch (err) {
       setFetchError('Failed to load assessments.');
-      setLoading(false);
-      return;
+      console.error(err);
     }
-
-    setAssessments(data.map(a => ({
-      id:          a.id,
-      title:       a.title,
-      topic:       a.topic,
-      status:      a.status,
-      accessCode:  a.access_code,
-      questions:   a.questions.length,
-      maxMarks:    a.questions.reduce((sum, q) => sum + (q.marks || 0), 0),
-      submissions: 0,
-    })));
     setLoading(false);
   }, [user.id]);
 
@@ -173,19 +192,34 @@ function Assessments({ onNavigate }) {
   const saveAssessment = async (status) => {
     setSaving(true);
     try {
-      let assessmentId;
+      let assessmentId, accessCode;
 
       if (editingId) {
         // ── UPDATE path ──
-        const updateData = { title: form.title, topic: form.topic, status };
-        // Generate a fresh code when publishing a draft for the first time
-        if (status === 'Active') updateData.access_code = generateAccessCode();
-
-        const { error: aErr } = await supabase
-          .from('assessments')
-          .update(updateData)
-          .eq('id', editingId);
-        if (aErr) throw aErr;
+        // Only send the columns that changed; skip the UPDATE if none did
+        const current    = assessments.find(a => a.id === editingId) ?? {};
+        const updateData = {};
+        accessCode       = current.accessCode ?? null;
+        if (form.title !== current.title)         updateData.title  = form.title;
+        if (form.topic !== (current.topic || '')) updateData.topic  = form.topic;
+        if (status     !== current.status)        updateData.status = status;
+        // Generate a code only when publishing a draft for the first time —
+        // an assessment that already has one keeps it, so students' codes stay valid
+        if (status === 'Active' && !current.accessCode) updateData.access_code = generateAccessCode();
+
+        if (Object.keys(updateData).length > 0) {
+          // RETURNING the code covers the case where a clash forced a retry
+          const { data: updated, error: aErr } = await writeWithAccessCode(updateData, data =>
+            supabase
+              .from('assessments')
+              .update(data)
+              .eq('id', editingId)
+              .select('access_code')
+              .single()
+          );
+          if (aErr) throw aErr;
+          accessCode = updated.access_code;
+        }
 
         const { error: dErr } = await supabase
           .from('questions')
@@ -199,13 +233,16 @@ function Assessments({ onNavigate }) {
         const insertData = { title: form.title, topic: form.topic, status, created_by: user.id };
         if (status === 'Active') insertData.access_code = generateAccessCode();
 
-        const { data: assessment, error: aErr } = await supabase
-          .from('assessments')
-          .insert(insertData)
-          .select()
-          .single();
+        const { data: assessment, error: aErr } = await writeWithAccessCode(insertData, data =>
+          supabase
+            .from('assessments')
+            .insert(data)
+            .select('id, access_code')
+            .single()
+        );
         if (aErr) throw aErr;
         assessmentId = assessment.id;
+        accessCode   = assessment.access_code;
       }
 
       const { error: qErr } = await supabase
@@ -222,13 +259,29 @@ function Assessments({ onNavigate }) {
         );
       if (qErr) throw qErr;
 
+      // Everything the list row shows was just written, so patch it in
+      // locally instead of re-reading the whole list after the save
+      const row = {
+        id:         assessmentId,
+        title:      form.title,
+        topic:      form.topic,
+        status,
+        accessCode,
+        questions:  form.questions.length,
+        maxMarks:   totalMarks,
+      };
+      setAssessments(prev => editingId
+        ? prev.map(a => a.id === editingId ? { ...a, ...row } : a)
+        : [{ ...row, submissions: 0 }, ...prev]);
+
+      invalidateQueries(`analytics:${assessmentId}`);
+      invalidateQueries('assessments:');
       closePanel();
       showToast(
         editingId
           ? (status === 'Draft' ? 'Draft updated successfully.' : 'Assessment published.')
           : (status === 'Draft' ? 'Assessment saved as draft.'  : 'Assessment published successfully.')
       );
-      fetchAssessments();
     } catch (err) {
       showToast('Something went wrong. Please try again.');
       console.error(err);
@@ -250,6 +303,13 @@ function Assessments({ onNavigate }) {
   };
 
   // ── Close / Reopen ────────────────────────────────────────────────────────
+  // A status change only touches a field or two, so the row is patched in
+  // place rather than refetching the whole list after the single UPDATE.
+  const patchRow = (id, changes) => {
+    setAssessments(prev => prev.map(a => a.id === id ? { ...a, ...changes } : a));
+    invalidateQueries('assessments:');
+  };
+
   const handleClose = async (id) => {
     setMutating(true);
     const { error } = await supabase
@@ -257,18 +317,24 @@ function Assessments({ onNavigate }) {
       .update({ status: 'Closed' })
       .eq('id', id);
     if (error) showToast('Failed to close assessment.');
-    else { showToast('Assessment closed.'); fetchAssessments(); }
+    else { patchRow(id, { status: 'Closed' }); showToast('Assessment closed.'); }
     setMutating(false);
   };
 
+  // Reopening keeps the old access code unless another open assessment has
+  // taken it since, in which case a new one is issued and shown in the row
   const handleReopen = async (id) => {
     setMutating(true);
-    const { error } = await supabase
-      .from('assessments')
-      .update({ status: 'Active' })
-      .eq('id', id);
+    const { data, error } = await writeWithAccessCode({ status: 'Active' }, update =>
+      supabase
+        .from('assessments')
+        .update(update)
+        .eq('id', id)
+        .select('access_code')
+        .single()
+    );
     if (error) showToast('Failed to reopen assessment.');
-    else { showToast('Assessment reopened.'); fetchAssessments(); }
+    else { patchRow(id, { status: 'Active', accessCode: data.access_code }); showToast('Assessment reopened.'); }
     setMutating(false);
   };
 
@@ -285,18 +351,24 @@ function Assessments({ onNavigate }) {
       if (subs && subs.length > 0) {
         const subIds = subs.map(s => s.id);
         await supabase.from('answers').delete().in('submission_id', subIds);
-        await supabase.from('submissions').delete().eq('assessment_id', id);
       }
 
-      await supabase.from('student_assessments').delete().eq('assessment_id', id);
-      await supabase.from('questions').delete().eq('assessment_id', id);
+      // With the answers gone nothing references these rows any more,
+      // so the three child tables are cleared concurrently
+      await Promise.all([
+        supabase.from('submissions').delete().eq('assessment_id', id),
+        supabase.from('student_assessments').delete().eq('assessment_id', id),
+        supabase.from('questions').delete().eq('assessment_id', id),
+      ]);
 
       const { error } = await supabase.from('assessments').delete().eq('id', id);
       if (error) throw error;
 
+      invalidateQueries(`analytics:${id}`);
+      invalidateQueries('assessments:');
+      setAssessments(prev => prev.filter(a => a.id !== id));
       setConfirmDeleteId(null);
       showToast('Assessment deleted.');
-      fetchAssessments();
     } catch (err) {
       showToast('Failed to delete assessment. Please try again.');
       console.error(err);
@@ -1,5 +1,7 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useMemo } from 'react';
 import { supabase } from '../supabaseClient';
+import { invalidateQueries } from '../queryCache';
+import { gradeLabel } from '../grades';
 import './GradingDetail.css';
 
 // ── Circular progress ring ─────────────────────────────────────────────────
@@ -28,16 +30,20 @@ function CircularProgress({ value, max, size = 104, strokeWidth = 9 }) {
 }
 
 // ── Helpers ────────────────────────────────────────────────────────────────
-function gradeLabel(pct) {
-  if (pct === null) return 'Not Graded';
-  if (pct >= 90) return 'Excellent';
-  if (pct >= 75) return 'Good';
-  if (pct >= 60) return 'Satisfactory';
-  return 'Needs Improvement';
-}
+// Matches one word (a run of non-whitespace). Hoisted so the pattern is
+// built once, not on every answer card render.
+const WORD_RE = /\S+/g;
 
 function wordCount(text) {
-  return text ? text.trim().split(/\s+/).filter(Boolean).length : 0;
+  return text ? (text.match(WORD_RE)?.length ?? 0) : 0;
+}
+
+// Mark inputs pre-filled with each answer's stored marks_awarded (blank if none)
+function overridesFrom(answers) {
+  return Object.fromEntries(answers.map(a => [
+    a.id,
+    a.marks_awarded !== null ? String(a.marks_awarded) : '',
+  ]));
 }
 
 // ── Component ──────────────────────────────────────────────────────────────
@@ -66,25 +72,18 @@ function GradingDetail({ submission, onNavigate }) {
         marks_awarded,
         questions ( id, text, marks, sample_answer, order_index )
       `)
-      .eq('submission_id', submission.id);
+      .eq('submission_id', submission.id)
+      // Ordered server-side by the embedded question's position
+      .order('questions(order_index)', { ascending: true });
 
     if (error || !data) {
       setLoading(false);
       return;
     }
 
-    const sorted = [...data].sort(
-      (a, b) => (a.questions?.order_index ?? 0) - (b.questions?.order_index ?? 0)
-    );
-
-    setAnswers(sorted);
+    setAnswers(data);
 
-    // Pre-fill overrides with any existing marks_awarded values
-    const init = {};
-    sorted.forEach(a => {
-      init[a.id] = a.marks_awarded !== null ? String(a.marks_awarded) : '';
-    });
-    setOverrides(init);
+    setOverrides(overridesFrom(data));
     setLoading(false);
   }, [submission]);
 
@@ -100,11 +99,19 @@ function GradingDetail({ submission, onNavigate }) {
   const handleRunAI = async () => {
     setAiScoring(true);
     try {
-      const { error } = await supabase.functions.invoke('grade-submission', {
+      const { data, error } = await supabase.functions.invoke('grade-submission', {
         body: { submission_id: submission.id },
       });
       if (error) throw error;
-      await fetchAnswers(); // pull fresh ai_score values into state
+      invalidateQueries(`analytics:${submission.assessmentId}`);
+
+      // The function returns the new ai_score per answer — merge them into
+      // state instead of re-reading every answer. null means that answer
+      // wasn't scored (and wasn't written), so its current value stands.
+      const aiScores = new Map(
+        (data?.results ?? []).filter(r => r.ai_score !== null).map(r => [r.id, r.ai_score])
+      );
+      setAnswers(prev => prev.map(a => aiScores.has(a.id) ? { ...a, ai_score: aiScores.get(a.id) } : a));
       showToast('AI grading complete.');
     } catch (err) {
       showToast('AI grading failed. Please try again.');
@@ -136,16 +143,20 @@ function GradingDetail({ submission, onNavigate }) {
   const handleSaveGrades = async () => {
     setSaving(true);
     try {
-      for (const answer of answers) {
-        const val = parseInt(overrides[answer.id], 10);
-        if (!isNaN(val)) {
-          const { error } = await supabase
-            .from('answers')
-            .update({ marks_awarded: val })
-            .eq('id', answer.id);
-          if (error) throw error;
-        }
-      }
+      // Only write marks that actually changed — untouched answers cost no
+      // request — and send the changed ones concurrently, not one at a time
+      const changed = answers
+        .map(answer => ({ id: answer.id, prev: answer.marks_awarded, val: parseInt(overrides[answer.id], 10) }))
+        .filter(({ prev, val }) => !isNaN(val) && val !== prev);
+
+      const results = await Promise.all(changed.map(({ id, val }) =>
+        supabase
+          .from('answers')
+          .update({ marks_awarded: val })
+          .eq('id', id)
+      ));
+      const failed = results.find(r => r.error);
+      if (failed) throw failed.error;
 
       const { error: sErr } = await supabase
         .from('submissions')
@@ -153,11 +164,20 @@ function GradingDetail({ submission, onNavigate }) {
         .eq('id', submission.id);
       if (sErr) throw sErr;
 
+      invalidateQueries(`analytics:${submission.assessmentId}`);
       setStatus('Graded');
       setOverrideMode(false);
       setGradingMode(null);
       showToast('Grades saved successfully.');
-      await fetchAnswers();
+
+      // Apply the saved marks locally — everything else on the answers is
+      // unchanged, so there's nothing to re-read. The inputs are re-seeded
+      // from the stored marks, so one cleared (and so not written) shows its
+      // mark again rather than staying blank.
+      const saved   = new Map(changed.map(({ id, val }) => [id, val]));
+      const patched = answers.map(a => saved.has(a.id) ? { ...a, marks_awarded: saved.get(a.id) } : a);
+      setAnswers(patched);
+      setOverrides(overridesFrom(patched));
     } catch (err) {
       showToast('Failed to save grades. Please try again.');
       console.error(err);
@@ -171,6 +191,14 @@ function GradingDetail({ submission, onNavigate }) {
     setTimeout(() => setToast(''), 3500);
   };
 
+  // ── Per-answer word counts ────────────────────────────────────────────────
+  // Depend only on the answer texts, so they're counted once per fetch rather
+  // than on every render while marks are being typed
+  const wordCounts = useMemo(
+    () => Object.fromEntries(answers.map(a => [a.id, wordCount(a.answer_text)])),
+    [answers]
+  );
+
   // ── Guard ─────────────────────────────────────────────────────────────────
   if (!submission) {
     return (
@@ -322,7 +350,7 @@ function GradingDetail({ submission, onNavigate }) {
                             </span>
                           )}
                           <span className="gd-word-count">
-                            {wordCount(a.answer_text)} words
+                            {wordCounts[a.id]} words
                           </span>
                         </div>
                       </div>
@@ -1,6 +1,9 @@
 import { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery, peekQuery } from '../queryCache';
+import { formatDate } from '../dates';
+import { fetchKeysetPage, usePagedList, LoadMoreButton } from '../pagination';
 import './GradingQueue.css';
 
 const FILTERS = [
@@ -9,6 +12,13 @@ const FILTERS = [
   { key: 'Graded',         label: 'Graded'         },
 ];
 
+// Rows fetched per page, newest first (see pagination.js), so a lecturer with
+// years of submissions never pulls the whole table
+const PAGE_SIZE = 50;
+
+// Student names rarely change, so they're cached per student for the session
+const NAME_TTL_MS = 60 * 60 * 1000;
+
 // ── Helpers ────────────────────────────────────────────────────────────────
 function statusClass(s) {
   return {
@@ -29,92 +39,109 @@ function initials(name) {
   return name.split(' ').map(w => w[0] ?? '').join('').toUpperCase().slice(0, 2);
 }
 
+// DataLoader-style name lookup: names already cached are served from memory
+// and the rest are fetched in one batched profiles query, then cached per
+// student so later visits only ask for students they haven't seen.
+async function loadStudentNames(ids) {
+  const key     = id => `profile-name:${id}`;
+  const missing = ids.filter(id => !peekQuery(key(id), NAME_TTL_MS));
+  const pending = missing.length
+    ? supabase
+        .from('profiles')
+        .select('id, full_name')
+        .in('id', missing)
+        .then(({ data, error }) => {
+          if (error) throw error;
+          return Object.fromEntries(data.map(p => [p.id, p.full_name]));
+        })
+    : null;
+
+  const names = await Promise.all(ids.map(id =>
+    cachedQuery(key(id), NAME_TTL_MS, () => pending.then(m => m[id] ?? null))
+  ));
+  return Object.fromEntries(ids.map((id, i) => [id, names[i]]));
+}
+
 // ── Component ──────────────────────────────────────────────────────────────
 function GradingQueue({ onNavigate }) {
   const { user } = useUser();
 
-  const [submissions,  setSubmissions]  = useState([]);
-  const [loading,      setLoading]      = useState(true);
   const [activeFilter, setActiveFilter] = useState('All');
-
-  // ── Fetch all submissions for the lecturer's assessments ──────────────────
-  const fetchSubmissions = useCallback(async () => {
-    setLoading(true);
-
-    // Step 1: get the IDs of assessments this lecturer created
-    const { data: myAssessments, error: aErr } = await supabase
-      .from('assessments')
-      .select('id')
-      .eq('created_by', user.id);
-
-    if (aErr || !myAssessments || myAssessments.length === 0) {
-      setSubmissions([]);
-      setLoading(false);
-      return;
-    }
-
-    const assessmentIds = myAssessments.map(a => a.id);
-
-    // Step 2: get submissions for those assessments, with assessment title
-    const { data: subs, error: sErr } = await supabase
+  const [counts,       setCounts]       = useState(null); // per-tab totals; false if they failed to load
+
+  // ── Fetch a page of submissions for the lecturer's assessments ────────────
+  // Returns the page after `cursor` (the last loaded row), or the first page.
+  // The active tab's status is filtered server-side, so each tab pages over
+  // its own rows — older pending work is never hidden behind graded pages.
+  const fetchPage = useCallback(async (cursor) => {
+    // Step 1: get submissions for this lecturer's assessments in one query —
+    // the inner join filters on the assessment's owner server-side
+    let query = supabase
       .from('submissions')
-      .select('id, submitted_at, status, assessment_id, student_id, assessments ( title )')
-      .in('assessment_id', assessmentIds)
-      .order('submitted_at', { ascending: false });
+      .select('id, submitted_at, status, assessment_id, student_id, assessments!inner ( title, created_by )')
+      .eq('assessments.created_by', user.id);
+    if (activeFilter !== 'All') query = query.eq('status', activeFilter);
 
-    if (sErr || !subs) {
-      setSubmissions([]);
-      setLoading(false);
-      return;
-    }
+    const { rows: subs, more } = await fetchKeysetPage(query, {
+      column:   'submitted_at',
+      cursor:   cursor && { value: cursor.submittedAt, id: cursor.id },
+      pageSize: PAGE_SIZE,
+    });
 
-    // Step 3: get student names from profiles
+    // Step 2: get student names from profiles
     const studentIds = [...new Set(subs.map(s => s.student_id))];
-    const { data: profiles } = await supabase
-      .from('profiles')
-      .select('id, full_name')
-      .in('id', studentIds);
-
-    const profileMap = Object.fromEntries((profiles ?? []).map(p => [p.id, p.full_name]));
-
-    setSubmissions(
-      subs.map(s => {
-        const name = profileMap[s.student_id] ?? 'Unknown Student';
-        return {
-          id:              s.id,
-          studentName:     name,
-          initials:        initials(name),
-          color:           avatarColor(name),
-          assessmentTitle: s.assessments?.title ?? '—',
-          assessmentId:    s.assessment_id,
-          studentId:       s.student_id,
-          status:          s.status,
-          submittedAt:     s.submitted_at,
-          date:            new Date(s.submitted_at).toLocaleDateString('en-GB', {
-            day: 'numeric', month: 'short', year: 'numeric',
-          }),
-        };
-      })
-    );
-    setLoading(false);
+    const profileMap = studentIds.length
+      ? await loadStudentNames(studentIds).catch(() => ({}))
+      : {};
+
+    const rows = subs.map(s => {
+      const name = profileMap[s.student_id] ?? 'Unknown Student';
+      return {
+        id:              s.id,
+        studentName:     name,
+        initials:        initials(name),
+        color:           avatarColor(name),
+        assessmentTitle: s.assessments?.title ?? '—',
+        assessmentId:    s.assessment_id,
+        studentId:       s.student_id,
+        status:          s.status,
+        submittedAt:     s.submitted_at,
+        date:            formatDate(s.submitted_at),
+      };
+    });
+    return { rows, more };
+  }, [user.id, activeFilter]);
+
+  // Changing tab changes fetchPage, so the list reloads from the first page
+  const {
+    rows: visible, loading, loadingMore, hasMore, reload, loadMore,
+  } = usePagedList(fetchPage);
+
+  useEffect(() => { reload(); }, [reload]);
+
+  // ── Tab counts ────────────────────────────────────────────────────────────
+  // Exact totals across all pages, one head-only count query per tab (no rows
+  // are transferred), rather than a tally of whatever pages are loaded
+  useEffect(() => {
+    const countFor = (key) => {
+      let query = supabase
+        .from('submissions')
+        .select('id, assessments!inner ( created_by )', { count: 'exact', head: true })
+        .eq('assessments.created_by', user.id);
+      if (key !== 'All') query = query.eq('status', key);
+      return query.then(({ count, error }) => {
+        if (error) throw error;
+        return [key, count ?? 0];
+      });
+    };
+
+    Promise.all(FILTERS.map(f => countFor(f.key)))
+      .then(entries => setCounts(Object.fromEntries(entries)))
+      .catch(err => { console.error(err); setCounts(false); });
   }, [user.id]);
 
-  useEffect(() => { fetchSubmissions(); }, [fetchSubmissions]);
-
-  // ── Derived values ────────────────────────────────────────────────────────
-  const visible = activeFilter === 'All'
-    ? submissions
-    : submissions.filter(s => s.status === activeFilter);
-
-  const counts = FILTERS.reduce((acc, f) => {
-    acc[f.key] = f.key === 'All'
-      ? submissions.length
-      : submissions.filter(s => s.status === f.key).length;
-    return acc;
-  }, {});
-
-  const graded = submissions.filter(s => s.status === 'Graded').length;
-  const total  = submissions.length;
+  const graded = counts ? counts['Graded'] : 0;
+  const total  = counts ? counts.All       : 0;
 
   return (
     <div className="gq-page">
@@ -124,7 +151,7 @@ function GradingQueue({ onNavigate }) {
         <div>
           <div className="gq-topbar-title">Grading Queue</div>
           <div className="gq-topbar-sub">
-            {loading ? 'Loading…' : (
+            {counts === null ? 'Loading…' : counts && (
               <>
                 {graded} of {total} graded
                 {total > 0 && (
@@ -150,7 +177,7 @@ function GradingQueue({ onNavigate }) {
             onClick={() => setActiveFilter(f.key)}
           >
             {f.label}
-            <span className="gq-filter-count">{counts[f.key]}</span>
+            {counts && <span className="gq-filter-count">{counts[f.key]}</span>}
           </button>
         ))}
       </div>
@@ -217,6 +244,8 @@ function GradingQueue({ onNavigate }) {
         </table>
       </div>
 
+      {!loading && hasMore && <LoadMoreButton loading={loadingMore} onClick={loadMore} />}
+
     </div>
   );
 }
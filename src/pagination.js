@@ -0,0 +1,91 @@
+import { useState, useCallback, useRef } from 'react';
+import './pagination.css';
+
+// Keyset ("seek") pagination shared by the long lists (Results, GradingQueue).
+// Rows are ordered newest first by `column`, with the id as a tie-breaker, and
+// each later page is keyed on the last loaded row rather than an offset — so
+// deep pages cost the same as the first however many rows there are.
+
+// Runs `query` (a supabase select, already filtered) for the page after
+// `cursor` ({ value, id } of the last loaded row), or the first page when
+// cursor is null. One extra row is requested to tell whether another page
+// exists. Resolves to { rows, more, count } — count is only set if the select
+// asked for one.
+export async function fetchKeysetPage(query, { column, cursor, pageSize }) {
+  if (cursor) {
+    const v = `"${cursor.value}"`;
+    query = query.or(`${column}.lt.${v},and(${column}.eq.${v},id.lt.${cursor.id})`);
+  }
+
+  const { data, count, error } = await query
+    .order(column, { ascending: false })
+    .order('id',   { ascending: false })
+    .limit(pageSize + 1);
+  if (error) throw error;
+
+  return {
+    rows:  data.slice(0, pageSize),
+    more:  data.length > pageSize,
+    count,
+  };
+}
+
+// Holds a paged list. `fetchPage(lastRow)` returns { rows, more } for the
+// page after lastRow, or the first page when lastRow is null.
+//   reload(loadFirst?) replaces the list with the first page — loadFirst lets
+//     a caller serve it from a cache. Resolves to the page, so callers can
+//     read extras such as a total, or null if it failed or a newer reload
+//     superseded it.
+//   loadMore() appends the next page. A reload in the meantime discards it,
+//     so a page fetched for an old filter never lands in the new list.
+export function usePagedList(fetchPage) {
+  const [rows,        setRows]        = useState([]);
+  const [loading,     setLoading]     = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [hasMore,     setHasMore]     = useState(false);
+  const generation = useRef(0);
+
+  const reload = useCallback(async (loadFirst = () => fetchPage(null)) => {
+    const gen = ++generation.current;
+    setLoading(true);
+
+    let page = null;
+    try {
+      page = await loadFirst();
+    } catch (err) {
+      console.error(err);
+    }
+    if (gen !== generation.current) return null;
+
+    setRows(page?.rows ?? []);
+    setHasMore(page?.more ?? false);
+    setLoading(false);
+    return page;
+  }, [fetchPage]);
+
+  const loadMore = async () => {
+    const gen = generation.current;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(rows[rows.length - 1]);
+      if (gen === generation.current) {
+        setRows(prev => [...prev, ...page.rows]);
+        setHasMore(page.more);
+      }
+    } catch (err) {
+      console.error(err);
+    }
+    setLoadingMore(false);
+  };
+
+  return { rows, loading, loadingMore, hasMore, reload, loadMore };
+}
+
+// "Load more" button shown under a paged list while more pages remain
+export function LoadMoreButton({ loading, onClick }) {
+  return (
+    <button className="load-more" onClick={onClick} disabled={loading}>
+      {loading ? 'Loading…' : 'Load more'}
+    </button>
+  );
+}
@@ -0,0 +1,21 @@
+import { supabase } from './supabaseClient';
+import { cachedQuery } from './queryCache';
+
+// A user's role and name only change at sign-up, so the profiles row is fetched
+// once per session. LoginPage's lookup, the SIGNED_IN event that follows it and
+// every hourly TOKEN_REFRESHED all share the same cached row.
+const PROFILE_TTL_MS = 60 * 60 * 1000;
+
+// Resolves to { role, full_name } for the given user, or null when the row
+// can't be read (callers fall back to user_metadata in that case).
+export function fetchProfile(userId) {
+  return cachedQuery(`profile:${userId}`, PROFILE_TTL_MS, async () => {
+    const { data, error } = await supabase
+      .from('profiles')
+      .select('role, full_name')
+      .eq('id', userId)
+      .single();
+    if (error) throw error;
+    return data;
+  }).catch(() => null);
+}
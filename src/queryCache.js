@@ -0,0 +1,48 @@
+// In-memory cache for slow-changing Supabase reads (analytics, lists).
+// Entries live for the lifetime of the tab and expire after their TTL, timed
+// with the monotonic performance.now() so clock changes can't skew expiry.
+// Keys are plain strings namespaced by feature, e.g. 'analytics:<id>', so a
+// write can drop every related entry with a single prefix.
+const cache = new Map();
+
+// Returns the cached value for `key` if it is younger than `ttlMs`, otherwise
+// runs `fetcher` and stores its result. The in-flight promise is stored, so
+// concurrent callers (e.g. StrictMode double effects) share one request.
+// If `fetcher` throws, nothing is cached and the error propagates.
+export function cachedQuery(key, ttlMs, fetcher) {
+  const hit = cache.get(key);
+  if (hit && performance.now() - hit.at < ttlMs) return hit.promise;
+
+  const promise = fetcher();
+  cache.set(key, { promise, at: performance.now() });
+  promise.catch(() => {
+    if (cache.get(key)?.promise === promise) cache.delete(key);
+  });
+  return promise;
+}
+
+// Returns the cached promise for `key` if it is younger than `ttlMs`,
+// without fetching. Lets callers work out which keys still need loading.
+export function peekQuery(key, ttlMs) {
+  const hit = cache.get(key);
+  return hit && performance.now() - hit.at < ttlMs ? hit.promise : undefined;
+}
+
+// Re-runs `fetcher` for `key` in the background. The old entry keeps being
+// served until the new value arrives, so callers can show stale data while
+// it refreshes (stale-while-revalidate). A failed refresh keeps the old entry.
+export function refreshQuery(key, fetcher) {
+  const promise = fetcher();
+  return promise.then(value => {
+    cache.set(key, { promise, at: performance.now() });
+    return value;
+  });
+}
+
+// Drops every entry whose key starts with `prefix`.
+// Call after a write so the next read goes back to Supabase.
+export function invalidateQueries(prefix) {
+  for (const key of cache.keys()) {
+    if (key.startsWith(prefix)) cache.delete(key);
+  }
+}
@@ -1,6 +1,9 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useMemo } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery } from '../queryCache';
+import { gradeLabel } from '../grades';
+import { formatShortDate } from '../dates';
 import './Analytics.css';
 
 // ── Helpers ────────────────────────────────────────────────────────────────
@@ -11,15 +14,12 @@ function scoreColor(pct) {
 }
 
 function scoreLabel(pct) {
-  if (pct >= 90) return 'Excellent';
-  if (pct >= 75) return 'Good';
-  if (pct >= 60) return 'Satisfactory';
-  return 'Needs Work';
+  return gradeLabel(pct, 'Needs Work');
 }
 
-function shortDate(iso) {
-  return new Date(iso).toLocaleDateString('en-GB', { day: 'numeric', month: 'short' });
-}
+// Grades only change when a lecturer grades, so a short TTL keeps repeat
+// visits off the network without hiding new grades for long.
+const ANALYTICS_TTL_MS = 60 * 1000;
 
 // ── Component ──────────────────────────────────────────────────────────────
 function Analytics() {
@@ -32,41 +32,43 @@ function Analytics() {
   const load = useCallback(async () => {
     setLoading(true);
 
-    // All graded submissions with assessment info, ordered oldest-first for the chart
-    const { data: subs } = await supabase
-      .from('submissions')
-      .select('id, submitted_at, assessments(title, topic)')
-      .eq('student_id', user.id)
-      .eq('status', 'Graded')
-      .order('submitted_at', { ascending: true });
-
-    if (!subs?.length) {
-      setSubmissions([]);
-      setAnswers([]);
-      setLoading(false);
-      return;
-    }
+    const { subs, ans } = await cachedQuery(`student:${user.id}:analytics`, ANALYTICS_TTL_MS, async () => {
+      // All graded submissions, oldest-first for the chart, with their
+      // answers embedded so scores come back in the same round trip
+      const { data, error } = await supabase
+        .from('submissions')
+        .select(`
+          id,
+          submitted_at,
+          assessments ( title, topic ),
+          answers ( submission_id, marks_awarded, questions ( marks, text, order_index ) )
+        `)
+        .eq('student_id', user.id)
+        .eq('status', 'Graded')
+        .order('submitted_at', { ascending: true });
+      if (error) throw error;
 
-    // Answers for those submissions to compute scores
-    const { data: ans } = await supabase
-      .from('answers')
-      .select('submission_id, marks_awarded, questions(marks, text, order_index)')
-      .in('submission_id', subs.map(s => s.id));
+      return {
+        subs: data,
+        ans:  data.flatMap(s => s.answers ?? []),
+      };
+    }).catch(() => ({ subs: [], ans: [] }));
 
     setSubmissions(subs);
-    setAnswers(ans ?? []);
+    setAnswers(ans);
     setLoading(false);
   }, [user.id]);
 
   useEffect(() => { load(); }, [load]);
 
   // ── Derived stats ─────────────────────────────────────────────────────────
-  let stats = null;
-  if (!loading && submissions.length > 0) {
+  // Memoized so only a new fetch result re-runs the per-submission passes
+  const stats = useMemo(() => {
+    if (submissions.length === 0) return null;
 
-    // Per-submission score
+    // Per-submission score — answers arrive grouped under their submission
     const subScores = submissions.map(s => {
-      const subAnswers = answers.filter(a => a.submission_id === s.id);
+      const subAnswers = s.answers ?? [];
       const awarded    = subAnswers.reduce((sum, a) => sum + (a.marks_awarded ?? 0), 0);
       const max        = subAnswers.reduce((sum, a) => sum + (a.questions?.marks ?? 0), 0);
       const pct        = max > 0 ? Math.round((awarded / max) * 100) : null;
@@ -79,10 +81,16 @@ function Analytics() {
       };
     });
 
-    const scored   = subScores.filter(s => s.pct !== null);
-    const avg      = scored.length ? Math.round(scored.reduce((a, b) => a + b.pct, 0) / scored.length) : null;
-    const best     = scored.length ? Math.max(...scored.map(s => s.pct)) : null;
-    const latest   = scored.length ? scored[scored.length - 1].pct : null;
+    // Count, sum, best and latest in one pass over the scored submissions
+    let n = 0, sum = 0, best = null, latest = null;
+    for (const { pct } of subScores) {
+      if (pct === null) continue;
+      n++;
+      sum   += pct;
+      best   = best === null || pct > best ? pct : best;
+      latest = pct;
+    }
+    const avg      = n ? Math.round(sum / n) : null;
     const topics   = [...new Set(subScores.map(s => s.topic).filter(Boolean))];
 
     // Per-question performance (across all graded submissions)
@@ -106,8 +114,8 @@ function Analytics() {
         max:  q.n   > 0 ? +(q.max / q.n).toFixed(1) : null,
       }));
 
-    stats = { subScores, avg, best, latest, topics, qPerf };
-  }
+    return { subScores, avg, best, latest, topics, qPerf };
+  }, [submissions, answers]);
 
   // ── Render ────────────────────────────────────────────────────────────────
   return (
@@ -195,7 +203,7 @@ function Analytics() {
                       <div className="san-bar-label" title={s.title}>
                         {s.title.length > 12 ? `${s.title.slice(0, 12)}…` : s.title}
                       </div>
-                      <div className="san-bar-date">{shortDate(s.date)}</div>
+                      <div className="san-bar-date">{formatShortDate(s.date)}</div>
                     </div>
                   ))}
                 </div>
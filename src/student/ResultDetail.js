@@ -1,5 +1,7 @@
 import { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabaseClient';
+import { gradeLabel } from '../grades';
+import { formatDate } from '../dates';
 import './ResultDetail.css';
 
 // ── Circular progress ring (mirrors GradingDetail) ──────────────────────────
@@ -27,22 +29,6 @@ function CircularProgress({ value, max, size = 104, strokeWidth = 9 }) {
   );
 }
 
-// ── Helpers ─────────────────────────────────────────────────────────────────
-function gradeLabel(pct) {
-  if (pct === null) return 'Not Graded';
-  if (pct >= 90)   return 'Excellent';
-  if (pct >= 75)   return 'Good';
-  if (pct >= 60)   return 'Satisfactory';
-  return 'Needs Improvement';
-}
-
-function formatDate(iso) {
-  if (!iso) return '—';
-  return new Date(iso).toLocaleDateString('en-GB', {
-    day: 'numeric', month: 'short', year: 'numeric',
-  });
-}
-
 // ── Component ────────────────────────────────────────────────────────────────
 function ResultDetail({ submission, onNavigate }) {
   const [answers, setAnswers] = useState([]);
@@ -55,16 +41,16 @@ function ResultDetail({ submission, onNavigate }) {
     const { data, error } = await supabase
       .from('answers')
       .select('id, answer_text, marks_awarded, questions ( id, text, marks, order_index )')
-      .eq('submission_id', submission.id);
+      .eq('submission_id', submission.id)
+      // Ordered server-side by the embedded question's position
+      .order('questions(order_index)', { ascending: true });
 
     if (error || !data) {
       setLoading(false);
       return;
     }
 
-    setAnswers(
-      [...data].sort((a, b) => (a.questions?.order_index ?? 0) - (b.questions?.order_index ?? 0))
-    );
+    setAnswers(data);
     setLoading(false);
   }, [submission]);
 
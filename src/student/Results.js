@@ -1,18 +1,40 @@
 import { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery } from '../queryCache';
+import { formatDate } from '../dates';
+import { fetchKeysetPage, usePagedList, LoadMoreButton } from '../pagination';
 import './Results.css';
 
+// Results load a page at a time, newest first (see pagination.js)
+const PAGE_SIZE = 20;
+
+// The first page is cached briefly; new submissions invalidate it directly
+// and grading changes show up once the TTL lapses.
+const RESULTS_TTL_MS = 60 * 1000;
+
+function toResult(s) {
+  const a        = s.assessments;
+  const maxMarks = a?.questions?.reduce((sum, q) => sum + (q.marks || 0), 0) ?? 0;
+  return {
+    id:          s.id,
+    title:       a?.title ?? '—',
+    topic:       a?.topic ?? '',
+    maxMarks,
+    status:      s.status,
+    submittedAt: s.submitted_at,
+  };
+}
+
 function Results({ onNavigate }) {
   const { user } = useUser();
 
-  const [submissions, setSubmissions] = useState([]);
-  const [loading,     setLoading]     = useState(true);
-
-  const fetchSubmissions = useCallback(async () => {
-    setLoading(true);
+  const [total, setTotal] = useState(0);
 
-    const { data, error } = await supabase
+  // Fetches the page after `cursor` (the last loaded row), or the first page.
+  // Only the first page asks for an exact total — later pages don't re-count.
+  const fetchPage = useCallback(async (cursor) => {
+    const query = supabase
       .from('submissions')
       .select(`
         id,
@@ -21,43 +43,27 @@ function Results({ onNavigate }) {
         assessments (
           title,
           topic,
-          questions ( id, marks )
+          questions ( marks )
         )
-      `)
-      .eq('student_id', user.id)
-      .order('submitted_at', { ascending: false });
+      `, cursor ? undefined : { count: 'exact' })
+      .eq('student_id', user.id);
 
-    if (error || !data) {
-      setSubmissions([]);
-      setLoading(false);
-      return;
-    }
-
-    setSubmissions(
-      data.map(s => {
-        const a        = s.assessments;
-        const maxMarks = a?.questions?.reduce((sum, q) => sum + (q.marks || 0), 0) ?? 0;
-        return {
-          id:          s.id,
-          title:       a?.title ?? '—',
-          topic:       a?.topic ?? '',
-          maxMarks,
-          status:      s.status,
-          submittedAt: s.submitted_at,
-        };
-      })
-    );
-    setLoading(false);
+    const page = await fetchKeysetPage(query, {
+      column:   'submitted_at',
+      cursor:   cursor && { value: cursor.submittedAt, id: cursor.id },
+      pageSize: PAGE_SIZE,
+    });
+    return { ...page, rows: page.rows.map(toResult) };
   }, [user.id]);
 
-  useEffect(() => { fetchSubmissions(); }, [fetchSubmissions]);
+  const {
+    rows: submissions, loading, loadingMore, hasMore, reload, loadMore,
+  } = usePagedList(fetchPage);
 
-  const formatDate = (iso) => {
-    if (!iso) return '—';
-    return new Date(iso).toLocaleDateString('en-GB', {
-      day: 'numeric', month: 'short', year: 'numeric',
-    });
-  };
+  useEffect(() => {
+    reload(() => cachedQuery(`student:${user.id}:results`, RESULTS_TTL_MS, () => fetchPage(null)))
+      .then(page => { if (page) setTotal(page.count ?? page.rows.length); });
+  }, [reload, fetchPage, user.id]);
 
   return (
     <div className="res-page">
@@ -66,7 +72,7 @@ function Results({ onNavigate }) {
       <div className="res-topbar">
         <div className="res-topbar-title">My Results</div>
         <div className="res-topbar-sub">
-          {loading ? 'Loading…' : `${submissions.length} submission${submissions.length !== 1 ? 's' : ''}`}
+          {loading ? 'Loading…' : `${total} submission${total !== 1 ? 's' : ''}`}
         </div>
       </div>
 
@@ -103,6 +109,8 @@ function Results({ onNavigate }) {
         )}
       </div>
 
+      {!loading && hasMore && <LoadMoreButton loading={loadingMore} onClick={loadMore} />}
+
     </div>
   );
 }
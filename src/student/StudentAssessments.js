@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { cachedQuery, invalidateQueries } from '../queryCache';
 import './StudentAssessments.css';
 
 // ── Mock data — Completed tab (replaced once submissions table exists) ──────
@@ -11,6 +12,10 @@ const COMPLETED_MOCK = [
   { id: 'A006', title: 'CS-301 Quiz 1', topic: 'Data Structures', questions: 3, maxMarks: 30,  score: null, status: 'Pending Review', submittedOn: 'Feb 20, 2026' },
 ];
 
+// Enrolments only change when this student joins, which invalidates the
+// entry directly; the TTL covers lecturers closing or reopening assessments.
+const ENROLLED_TTL_MS = 5 * 60 * 1000;
+
 // ── Helpers ────────────────────────────────────────────────────────────────
 function scoreClass(pct) {
   if (pct >= 85) return 'stu-score-high';
@@ -34,41 +39,28 @@ function StudentAssessments({ onNavigate }) {
   const fetchEnrolled = useCallback(async () => {
     setLoading(true);
 
-    // Step 1: get the IDs of assessments this student is enrolled in
-    const { data: enrollments, error: eErr } = await supabase
-      .from('student_assessments')
-      .select('assessment_id')
-      .eq('student_id', user.id);
-
-    if (eErr || !enrollments || enrollments.length === 0) {
-      setAvailable([]);
-      setLoading(false);
-      return;
-    }
-
-    // Step 2: fetch only Active assessments from that enrolled set
-    const ids = enrollments.map(e => e.assessment_id);
-
-    const { data, error } = await supabase
-      .from('assessments')
-      .select('id, title, topic, questions ( id, marks )')
-      .in('id', ids)
-      .eq('status', 'Active')
-      .order('created_at', { ascending: false });
-
-    if (error) {
-      setAvailable([]);
-      setLoading(false);
-      return;
-    }
-
-    setAvailable(data.map(a => ({
-      id:        a.id,
-      title:     a.title,
-      topic:     a.topic,
-      questions: a.questions.length,
-      maxMarks:  a.questions.reduce((sum, q) => sum + (q.marks || 0), 0),
-    })));
+    const rows = await cachedQuery(`student:${user.id}:enrolled`, ENROLLED_TTL_MS, async () => {
+      // One query: the student's enrolments with the assessment embedded.
+      // The inner join drops enrolments whose assessment isn't Active, and
+      // the rows come back newest first by the embedded assessment's date.
+      const { data, error } = await supabase
+        .from('student_assessments')
+        .select('assessments!inner ( id, title, topic, questions ( marks ) )')
+        .eq('student_id', user.id)
+        .eq('assessments.status', 'Active')
+        .order('assessments(created_at)', { ascending: false });
+      if (error) throw error;
+
+      return data.map(({ assessments: a }) => ({
+        id:        a.id,
+        title:     a.title,
+        topic:     a.topic,
+        questions: a.questions.length,
+        maxMarks:  a.questions.reduce((sum, q) => sum + (q.marks || 0), 0),
+      }));
+    }).catch(() => []);
+
+    setAvailable(rows);
     setLoading(false);
   }, [user.id]);
 
@@ -83,10 +75,11 @@ function StudentAssessments({ onNavigate }) {
     setJoining(true);
     setCodeError('');
 
-    // Look up the assessment by access code
+    // Look up the assessment by access code — only the id (to enrol) and the
+    // title (for the toast) are needed; status is already fixed by the filter
     const { data: assessment, error: aErr } = await supabase
       .from('assessments')
-      .select('id, title, status')
+      .select('id, title')
       .eq('access_code', code)
       .eq('status', 'Active')
       .single();
@@ -114,6 +107,7 @@ function StudentAssessments({ onNavigate }) {
 
     setCodeInput('');
     showToast(`Joined "${assessment.title}" successfully!`);
+    invalidateQueries(`student:${user.id}:enrolled`);
     fetchEnrolled();
     setJoining(false);
   };
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { supabase } from '../supabaseClient';
 import { useUser } from '../UserContext';
+import { invalidateQueries } from '../queryCache';
 import './TakeTest.css';
 
 function TakeTest({ assessment, onNavigate }) {
@@ -26,28 +27,45 @@ function TakeTest({ assessment, onNavigate }) {
   const loadAssessment = async () => {
     setLoading(true);
 
-    // Check whether this student already submitted for this assessment
-    const { data: existing } = await supabase
-      .from('submissions')
-      .select('id')
-      .eq('assessment_id', assessment.id)
-      .eq('student_id', user.id)
-      .maybeSingle();
+    // Check the assessment is still open, check for an existing submission and
+    // fetch the questions (ordered by their original position) concurrently —
+    // all only need the assessment id. Head-only counts answer the yes/no
+    // questions without returning rows. The open check matters because the
+    // enrolled list is cached, so it can still show an assessment that a
+    // lecturer has just closed.
+    const [{ count: open, error: aErr }, { count: existing }, { data, error: qErr }] = await Promise.all([
+      supabase
+        .from('assessments')
+        .select('id', { count: 'exact', head: true })
+        .eq('id', assessment.id)
+        .eq('status', 'Active'),
+      supabase
+        .from('submissions')
+        .select('id', { count: 'exact', head: true })
+        .eq('assessment_id', assessment.id)
+        .eq('student_id', user.id),
+      supabase
+        .from('questions')
+        .select('id, text, marks, answer_length')
+        .eq('assessment_id', assessment.id)
+        .order('order_index', { ascending: true }),
+    ]);
 
-    if (existing) {
-      setAlreadySubmitted(true);
+    if (!aErr && !open) {
+      // Drop the stale list so the closed assessment disappears on the way back
+      invalidateQueries(`student:${user.id}:enrolled`);
+      setError('This assessment is no longer open.');
       setLoading(false);
       return;
     }
 
-    // Fetch questions ordered by their original position
-    const { data, error: qErr } = await supabase
-      .from('questions')
-      .select('id, text, marks, answer_length')
-      .eq('assessment_id', assessment.id)
-      .order('order_index', { ascending: true });
+    if (existing > 0) {
+      setAlreadySubmitted(true);
+      setLoading(false);
+      return;
+    }
 
-    if (qErr || !data || data.length === 0) {
+    if (aErr || qErr || !data || data.length === 0) {
       setError('Failed to load questions. Please try again.');
       setLoading(false);
       return;
@@ -69,7 +87,7 @@ function TakeTest({ assessment, onNavigate }) {
       const { data: sub, error: subErr } = await supabase
         .from('submissions')
         .insert({ assessment_id: assessment.id, student_id: user.id })
-        .select()
+        .select('id')
         .single();
 
       if (subErr) throw subErr;
@@ -87,6 +105,8 @@ function TakeTest({ assessment, onNavigate }) {
 
       if (ansErr) throw ansErr;
 
+      // New submission — the student's cached results and lists are now stale
+      invalidateQueries(`student:${user.id}:`);
       setSubmitted(true);
     } catch (err) {
       setError('Something went wrong. Please try again.');
@@ -1,8 +1,20 @@
 import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
 
-// sentence-transformers/all-MiniLM-L6-v2 — fast, accurate semantic similarity
+// sentence-transformers/all-MiniLM-L6-v2 — fast, accurate semantic similarity.
+// The feature-extraction pipeline returns one sentence embedding per input, so
+// every answer in a submission is embedded in a single request.
 const HF_MODEL_URL =
-  "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-MiniLM-L6-v2";
+  "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-MiniLM-L6-v2/pipeline/feature-extraction";
+
+// Created once per isolate and reused by every request it serves, so warm
+// invocations keep their HTTP connections instead of re-initialising a client.
+// Uses the service role key so we can read/write all rows regardless of RLS.
+const supabase = createClient(
+  Deno.env.get("SUPABASE_URL") ?? "",
+  Deno.env.get("SUPABASE_SERVICE_ROLE_KEY") ?? ""
+);
+
+const hfKey = Deno.env.get("HUGGINGFACE_API_KEY") ?? "";
 
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
@@ -10,12 +22,205 @@ const corsHeaders = {
   "Access-Control-Allow-Methods": "POST, OPTIONS",
 };
 
+// Per-lecturer cap on grading calls — each one fans out into HuggingFace and
+// DB work, so bursts are rejected before any of that starts. Keyed on the
+// authenticated user id, not a client-supplied header. Windows live in the
+// isolate's memory, so this is a soft limit per warm instance. Timed with the
+// monotonic performance.now() rather than the wall clock.
+const RATE_LIMIT     = 10;
+const RATE_WINDOW_MS = 60 * 1000;
+const rateWindows    = new Map<string, { start: number; count: number }>();
+
+function isRateLimited(key: string): boolean {
+  const now    = performance.now();
+  const entry  = rateWindows.get(key);
+
+  if (!entry || now - entry.start >= RATE_WINDOW_MS) {
+    // Drop expired windows occasionally so the map can't grow without bound
+    if (rateWindows.size > 1000) {
+      for (const [k, w] of rateWindows) {
+        if (now - w.start >= RATE_WINDOW_MS) rateWindows.delete(k);
+      }
+    }
+    rateWindows.set(key, { start: now, count: 1 });
+    return false;
+  }
+
+  entry.count++;
+  return entry.count > RATE_LIMIT;
+}
+
+// Embeds all texts in one inference call. Returns one unit-length vector per
+// input, or null if the request fails or the response isn't a list of
+// sentence vectors.
+async function embedTexts(texts: string[]): Promise<number[][] | null> {
+  const hfRes = await fetch(HF_MODEL_URL, {
+    method: "POST",
+    headers: {
+      Authorization: `Bearer ${hfKey}`,
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      inputs: texts,
+      // wait_for_model prevents 503 when the model is cold-starting
+      options: { wait_for_model: true },
+    }),
+  });
+
+  if (!hfRes.ok) {
+    console.error("HuggingFace error:", await hfRes.text());
+    return null;
+  }
+
+  const vectors = await hfRes.json();
+  const valid = Array.isArray(vectors) && vectors.length === texts.length &&
+    vectors.every((v) => Array.isArray(v) && typeof v[0] === "number");
+  return valid ? vectors.map(normalize) : null;
+}
+
+// Scales a vector to unit length once, so comparing it with any number of
+// other unit vectors is a plain dot product with no per-pair norms.
+function normalize(v: number[]): number[] {
+  let sumSq = 0;
+  for (const x of v) sumSq += x * x;
+  const norm = Math.sqrt(sumSq);
+  return norm > 0 ? v.map((x) => x / norm) : v;
+}
+
+// Caches token -> caller for a short time so a lecturer grading several
+// submissions in a row doesn't pay the auth + profile lookups every call.
+// The TTL bounds how long a revoked token or changed role is still honoured.
+const AUTH_CACHE_TTL_MS = 30 * 1000;
+type Caller = { id: string; role: string | null };
+const authCache         = new Map<string, { caller: Caller; at: number }>();
+
+// Returns the token owner's id and role (null if they have no profile), or
+// undefined if the token itself is invalid. Invalid tokens are never cached.
+// Throws if the profile can't be read, so a transient failure isn't cached
+// as "not a lecturer".
+async function resolveCaller(token: string): Promise<Caller | undefined> {
+  const now    = performance.now();
+  const cached = authCache.get(token);
+  if (cached && now - cached.at < AUTH_CACHE_TTL_MS) return cached.caller;
+
+  const { data: { user }, error } = await supabase.auth.getUser(token);
+  if (error || !user) return undefined;
+
+  const { data: profile, error: profileErr } = await supabase
+    .from("profiles")
+    .select("role")
+    .eq("id", user.id)
+    .single();
+  // PGRST116 is .single() finding no row — a confirmed missing profile
+  if (profileErr && profileErr.code !== "PGRST116") throw profileErr;
+
+  // Drop expired entries occasionally so the map can't grow without bound
+  if (authCache.size > 1000) {
+    for (const [k, e] of authCache) {
+      if (now - e.at >= AUTH_CACHE_TTL_MS) authCache.delete(k);
+    }
+  }
+  const caller = { id: user.id, role: profile?.role ?? null };
+  authCache.set(token, { caller, at: now });
+  return caller;
+}
+
+// Resolves the caller from their Supabase access token and checks they are a
+// lecturer. Returns an error Response to send back, or the caller's user id
+// if allowed.
+async function authorize(req: Request): Promise<Response | string> {
+  const token = req.headers.get("Authorization")?.replace(/^Bearer\s+/i, "");
+  const deny = (status: number, error: string) =>
+    new Response(JSON.stringify({ error }), {
+      status,
+      headers: { ...corsHeaders, "Content-Type": "application/json" },
+    });
+
+  if (!token) return deny(401, "Missing authorization token");
+
+  let caller: Caller | undefined;
+  try {
+    caller = await resolveCaller(token);
+  } catch (err) {
+    console.error("Failed to read caller profile:", err.message);
+    return deny(500, "Could not verify your account. Please try again.");
+  }
+  if (caller === undefined) return deny(401, "Invalid or expired token");
+  if (caller.role !== "lecturer") return deny(403, "Only lecturers can run AI grading");
+
+  return caller.id;
+}
+
+// Embeddings keyed by their exact text and kept for the isolate's lifetime.
+// Sample answers repeat for every student on a question, and re-running AI
+// grading on a submission repeats all of its answers, so both are served
+// from memory after the first call. Least recently used entries are evicted
+// past EMBEDDING_CACHE_MAX.
+const EMBEDDING_CACHE_MAX = 1000;
+const embeddingCache      = new Map<string, number[]>();
+
+// Returns a vector for every distinct text, embedding only the cache misses
+// in one batched request. Identical texts are sent once and share a vector.
+// Returns null if the embedding request fails.
+async function embedCached(texts: string[]): Promise<Map<string, number[]> | null> {
+  const byText  = new Map<string, number[]>();
+  const missing: string[] = [];
+
+  for (const text of new Set(texts)) {
+    const hit = embeddingCache.get(text);
+    if (hit) {
+      // Re-insert so Map order tracks recency for eviction
+      embeddingCache.delete(text);
+      embeddingCache.set(text, hit);
+      byText.set(text, hit);
+    } else {
+      missing.push(text);
+    }
+  }
+
+  if (missing.length) {
+    const vectors = await embedTexts(missing);
+    if (!vectors) return null;
+
+    missing.forEach((text, i) => {
+      if (embeddingCache.size >= EMBEDDING_CACHE_MAX) {
+        embeddingCache.delete(embeddingCache.keys().next().value!);
+      }
+      embeddingCache.set(text, vectors[i]);
+      byText.set(text, vectors[i]);
+    });
+  }
+  return byText;
+}
+
+// Cosine similarity of two unit vectors (see normalize). A zero vector
+// stays zero, so it scores 0 as before.
+function cosineSimilarity(a: number[], b: number[]): number {
+  let dot = 0;
+  for (let i = 0; i < a.length; i++) dot += a[i] * b[i];
+  return dot;
+}
+
 Deno.serve(async (req) => {
   // Handle CORS preflight
   if (req.method === "OPTIONS") {
     return new Response("ok", { headers: corsHeaders });
   }
 
+  // Reject callers who aren't signed-in lecturers before parsing the body
+  // or running any grading queries
+  const callerId = await authorize(req);
+  if (callerId instanceof Response) return callerId;
+
+  // Rate limit per lecturer, so unauthenticated traffic can't spend anyone's
+  // budget and a spoofed header can't open a fresh window
+  if (isRateLimited(callerId)) {
+    return new Response(
+      JSON.stringify({ error: "Too many grading requests. Please wait a minute and try again." }),
+      { status: 429, headers: { ...corsHeaders, "Content-Type": "application/json", "Retry-After": "60" } }
+    );
+  }
+
   try {
     const { submission_id } = await req.json();
 
@@ -26,14 +231,6 @@ Deno.serve(async (req) => {
       );
     }
 
-    // Use service role key so we can read/write all rows regardless of RLS
-    const supabase = createClient(
-      Deno.env.get("SUPABASE_URL") ?? "",
-      Deno.env.get("SUPABASE_SERVICE_ROLE_KEY") ?? ""
-    );
-
-    const hfKey = Deno.env.get("HUGGINGFACE_API_KEY") ?? "";
-
     // Fetch all answers for the submission, joined with question details
     const { data: answers, error: fetchErr } = await supabase
       .from("answers")
@@ -47,53 +244,54 @@ Deno.serve(async (req) => {
       );
     }
 
-    // Score all answers in parallel — avoids sequential cold-start timeouts
-    const results = await Promise.all(answers.map(async (answer) => {
-      const sampleAnswer = answer.questions?.sample_answer;
-      const answerText   = answer.answer_text;
+    // Skip answers where either side is empty — cannot compute similarity
+    const scorable = answers.filter(
+      (a) => a.questions?.sample_answer?.trim() && a.answer_text?.trim()
+    );
 
-      // Skip if either side is empty — cannot compute similarity
-      if (!sampleAnswer?.trim() || !answerText?.trim()) {
-        return { id: answer.id, ai_score: null };
-      }
+    // Embed every student answer and sample answer through the cache — one
+    // batched HuggingFace request for whatever isn't cached yet, instead of
+    // one round trip per answer
+    const byText = scorable.length
+      ? await embedCached(scorable.flatMap((a) => [a.answer_text, a.questions.sample_answer]))
+      : null;
 
-      // Call HuggingFace Inference API
-      const hfRes = await fetch(HF_MODEL_URL, {
-        method: "POST",
-        headers: {
-          Authorization: `Bearer ${hfKey}`,
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          inputs: {
-            source_sentence: answerText,
-            sentences: [sampleAnswer],
-          },
-          // wait_for_model prevents 503 when the model is cold-starting
-          options: { wait_for_model: true },
-        }),
-      });
-
-      if (!hfRes.ok) {
-        const errText = await hfRes.text();
-        console.error(`HuggingFace error for answer ${answer.id}:`, errText);
-        return { id: answer.id, ai_score: null };
+    const scores = new Map<string | number, number>();
+    if (byText) {
+      for (const answer of scorable) {
+        const raw = cosineSimilarity(
+          byText.get(answer.answer_text)!,
+          byText.get(answer.questions.sample_answer)!
+        );
+        scores.set(answer.id, Math.max(0, Math.min(1, raw)));
       }
+    }
 
-      // Response is an array of cosine similarities, e.g. [0.847]
-      const scores     = await hfRes.json();
-      const raw        = Array.isArray(scores) ? scores[0] : null;
-      const similarity = typeof raw === "number" ? Math.max(0, Math.min(1, raw)) : null;
-
-      // Persist the score
-      if (similarity !== null) {
-        await supabase
-          .from("answers")
-          .update({ ai_score: similarity })
-          .eq("id", answer.id);
+    // Persist the scores with one UPDATE per answer, sent concurrently. Plain
+    // updates only touch ai_score on rows that still exist, so an answer
+    // deleted since the read above is not re-created and answer_text is never
+    // rewritten from a stale copy.
+    if (scores.size > 0) {
+      const writes = await Promise.all(
+        [...scores].map(([id, ai_score]) =>
+          supabase.from("answers").update({ ai_score }).eq("id", id)
+        )
+      );
+      const saveErr = writes.find((w) => w.error)?.error;
+      if (saveErr) {
+        // The client merges returned scores without re-reading, so a failed
+        // save must not look like success
+        console.error("Failed to save AI scores:", saveErr.message);
+        return new Response(
+          JSON.stringify({ error: "Failed to save AI scores", detail: saveErr.message }),
+          { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+        );
       }
+    }
 
-      return { id: answer.id, ai_score: similarity };
+    const results = answers.map((answer) => ({
+      id:       answer.id,
+      ai_score: scores.get(answer.id) ?? null,
     }));
 
     return new Response(JSON.stringify({ results }), {
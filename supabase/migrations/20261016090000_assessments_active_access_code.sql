@@ -0,0 +1,41 @@
+-- Join-by-code lookup (StudentAssessments.handleJoin):
+--   select ... from assessments where access_code = $1 and status = 'Active'
+--
+-- Only active assessments can be joined, so the index covers just those rows
+-- and stays small as drafts and closed assessments accumulate. It is unique:
+-- an access code must identify exactly one open assessment, which is what the
+-- client's .single() already assumes.
+-- Existing data may already have several open assessments sharing a code,
+-- which would make the index build fail. The oldest keeps its code; the
+-- rest get a fresh one in the client's XXXX-XXXX format (see
+-- generateAccessCode in Assessments.js).
+do $$
+declare
+  dup  record;
+  code text;
+begin
+  for dup in
+    select id
+    from (
+      select id, row_number() over (partition by access_code order by created_at, id) as rn
+      from public.assessments
+      where status = 'Active' and access_code is not null
+    ) ranked
+    where rn > 1
+  loop
+    loop
+      select string_agg(substr('ABCDEFGHJKLMNPQRSTUVWXYZ23456789', 1 + floor(random() * 32)::int, 1), '')
+        into code
+        from generate_series(1, 8);
+      code := substr(code, 1, 4) || '-' || substr(code, 5, 4);
+      exit when not exists (
+        select 1 from public.assessments where status = 'Active' and access_code = code
+      );
+    end loop;
+    update public.assessments set access_code = code where id = dup.id;
+  end loop;
+end $$;
+
+create unique index if not exists assessments_active_access_code_key
+  on public.assessments (access_code)
+  where status = 'Active';
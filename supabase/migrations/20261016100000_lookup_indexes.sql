@@ -0,0 +1,30 @@
+-- Indexes for the app's hot lookups. Postgres doesn't index foreign-key
+-- columns on its own, so every child-table read below was a sequential scan.
+
+-- Lecturer assessment list and analytics dropdown (Assessments, Analytics):
+--   where created_by = $1 order by created_at desc
+create index if not exists assessments_created_by_created_at_idx
+  on public.assessments (created_by, created_at desc);
+
+-- Analytics blocks (assessment_id in (...)), the grading queue join, and
+-- TakeTest's already-submitted check (assessment_id = $1 and student_id = $2)
+create index if not exists submissions_assessment_id_student_id_idx
+  on public.submissions (assessment_id, student_id);
+
+-- My Results keyset pages and student analytics:
+--   where student_id = $1 order by submitted_at desc, id desc
+create index if not exists submissions_student_id_submitted_at_idx
+  on public.submissions (student_id, submitted_at desc, id desc);
+
+-- Answers embedded under a submission (grading, results, analytics, AI scoring)
+create index if not exists answers_submission_id_idx
+  on public.answers (submission_id);
+
+-- An assessment's questions in order (TakeTest, edit panel):
+--   where assessment_id = $1 order by order_index
+create index if not exists questions_assessment_id_order_index_idx
+  on public.questions (assessment_id, order_index);
+
+-- A student's enrolments (StudentAssessments): where student_id = $1
+create index if not exists student_assessments_student_id_idx
+  on public.student_assessments (student_id);